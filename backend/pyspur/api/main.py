@@ -10,6 +10,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
+from ..utils.shutdown_hooks import run_shutdown_hooks
 from .api_app import api_app
 
 load_dotenv()
@@ -37,9 +38,13 @@ async def lifespan(app: FastAPI):
 
     yield
 
-    # Cleanup: Remove temporary directory and close ExitStack
-    exit_stack.close()
-    shutil.rmtree(temporary_static_dir, ignore_errors=True)
+    try:
+        # Cleanup: Release resources registered by loaded modules (e.g. shared HTTP clients)
+        await run_shutdown_hooks()
+    finally:
+        # Remove temporary directory and close ExitStack
+        exit_stack.close()
+        shutil.rmtree(temporary_static_dir, ignore_errors=True)
 
 
 app = FastAPI(lifespan=lifespan)
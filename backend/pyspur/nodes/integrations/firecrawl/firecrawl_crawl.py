@@ -1,12 +1,14 @@
 import asyncio
 import json
 import logging
-from typing import Optional
+import os
+from typing import Any, Dict, List, Optional
 
+import httpx
 from pydantic import BaseModel, Field  # type: ignore
 
-from firecrawl import FirecrawlApp  # type: ignore
-
+from ....utils.pydantic_utils import model_to_template_dict
+from ....utils.shutdown_hooks import register_shutdown_hook
 from ...base import (
     BaseNode,
     BaseNodeConfig,
@@ -16,6 +18,157 @@ from ...base import (
 from ...registry import NodeRegistry
 from ...utils.template_utils import render_template_or_get_first_string
 
+# Crawl status polling: fixed interval with an absolute deadline
+POLL_INTERVAL_SECONDS = 2
+MAX_WAIT_SECONDS = 30 * 60
+
+# Default cap on in-flight Firecrawl API requests; override with FIRECRAWL_MAX_CONCURRENCY
+DEFAULT_MAX_CONCURRENCY = 10
+
+# Transient 502 responses are retried like the firecrawl-py SDK does
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.5
+
+
+class _FirecrawlAsync:
+    """Minimal async client for the Firecrawl crawl endpoints.
+
+    Replaces the blocking firecrawl-py SDK calls so that crawl submissions and
+    status polls share one pooled HTTP/2 connection and never block the event loop.
+    The API key and URL are read per request, so key updates apply immediately.
+    """
+
+    def __init__(self) -> None:
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+        self.loop = asyncio.get_running_loop()
+
+    @staticmethod
+    def _api_url() -> str:
+        return os.getenv("FIRECRAWL_API_URL", "https://api.firecrawl.dev").rstrip("/")
+
+    @staticmethod
+    def _headers(api_url: str) -> Dict[str, str]:
+        api_key = os.getenv("FIRECRAWL_API_KEY")
+        # Only require API key when using cloud service
+        if "api.firecrawl.dev" in api_url and api_key is None:
+            raise ValueError("No API key provided")
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        return headers
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request, retrying 502 responses with exponential backoff."""
+        for attempt in range(MAX_RETRIES):
+            response = await self.client.request(method, url, **kwargs)
+            if response.status_code != 502:
+                break
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS * (2**attempt))
+        response.raise_for_status()
+        return response
+
+    async def async_crawl_url(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Start a crawl job and return the API response containing its ID."""
+        api_url = self._api_url()
+        response = await self._request(
+            "POST",
+            f"{api_url}/v1/crawl",
+            headers=self._headers(api_url),
+            json={"url": url, **params},
+        )
+        return response.json()
+
+    async def check_crawl_status(self, crawl_id: str) -> Dict[str, Any]:
+        """Return the status of a crawl job, with all result pages once it is completed."""
+        api_url = self._api_url()
+        headers = self._headers(api_url)
+        response = await self._request("GET", f"{api_url}/v1/crawl/{crawl_id}", headers=headers)
+        status_data: Dict[str, Any] = response.json()
+
+        if status_data.get("status") == "completed" and "data" in status_data:
+            status_data["data"] = await self._collect_pages(
+                status_data["data"], status_data.get("next"), headers
+            )
+
+        return status_data
+
+    async def _collect_pages(
+        self, data: List[Any], next_url: Optional[str], headers: Dict[str, str]
+    ) -> List[Any]:
+        """Follow the "next" links of a paginated crawl result.
+
+        A failed page is logged and the pages collected so far are returned, as the SDK does.
+        """
+        while next_url:
+            try:
+                page = (await self._request("GET", next_url, headers=headers)).json()
+            except Exception as e:
+                logging.error(f"Failed to fetch next crawl result page: {e}")
+                break
+            if not page.get("data"):
+                break
+            data.extend(page["data"])
+            next_url = page.get("next")
+        return data
+
+
+_CLIENT: Optional[_FirecrawlAsync] = None
+_SEMAPHORE: Optional[asyncio.Semaphore] = None
+
+
+async def _get_client() -> _FirecrawlAsync:
+    """Return the shared Firecrawl client, creating it on first use in the running loop.
+
+    A client left over from another event loop is closed before being replaced.
+    """
+    global _CLIENT, _SEMAPHORE
+    loop = asyncio.get_running_loop()
+    if _CLIENT is not None and (_CLIENT.loop is not loop or _CLIENT.client.is_closed):
+        if _CLIENT.loop is not loop:
+            # asyncio primitives are bound to the loop they were first used in
+            _SEMAPHORE = None
+        await close_firecrawl_client()
+    if _CLIENT is None:
+        _CLIENT = _FirecrawlAsync()
+    return _CLIENT
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Return the semaphore capping in-flight Firecrawl API requests across all nodes.
+
+    It is sized from FIRECRAWL_MAX_CONCURRENCY on first use.
+    """
+    global _SEMAPHORE
+    if _SEMAPHORE is None:
+        raw_value = os.getenv("FIRECRAWL_MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY))
+        try:
+            max_concurrency = int(raw_value)
+        except ValueError:
+            max_concurrency = 0
+        if max_concurrency <= 0:
+            raise ValueError(
+                f"FIRECRAWL_MAX_CONCURRENCY must be a positive integer, got {raw_value!r}"
+            )
+        _SEMAPHORE = asyncio.Semaphore(max_concurrency)
+    return _SEMAPHORE
+
+
+@register_shutdown_hook
+async def close_firecrawl_client() -> None:
+    """Close the shared Firecrawl client. Called on application shutdown."""
+    global _CLIENT
+    if _CLIENT is not None:
+        client, _CLIENT = _CLIENT, None
+        try:
+            await client.client.aclose()
+        except RuntimeError as e:
+            # The loop the client was created in may already be closed
+            logging.warning(f"Failed to close Firecrawl client: {e}")
+
 
 class FirecrawlCrawlNodeInput(BaseNodeInput):
     """Input for the FirecrawlCrawl node."""
@@ -42,7 +195,8 @@ class FirecrawlCrawlNodeConfig(BaseNodeConfig):
     limit: Optional[int] = Field(None, description="The maximum number of pages to crawl.")
     has_fixed_output: bool = True
     output_json_schema: str = Field(
-        default=json.dumps(FirecrawlCrawlNodeOutput.model_json_schema()),
+        # Kept as a plain default (not default_factory) so it shows up in the config JSON schema
+        default=json.dumps(FirecrawlCrawlNodeOutput.model_json_schema(), separators=(",", ":")),
         description="The JSON schema for the output of the node",
     )
 
@@ -67,38 +221,41 @@ class FirecrawlCrawlNode(BaseNode):
         """Run the FirecrawlCrawl node."""
         try:
             # Grab the entire dictionary from the input
-            raw_input_dict = input.model_dump()
+            raw_input_dict = model_to_template_dict(input)
 
             # Render url_template
             url_template = render_template_or_get_first_string(
                 self.config.url_template, raw_input_dict, self.name
             )
 
-            app = FirecrawlApp()  # type: ignore
+            client = await _get_client()
+            semaphore = _get_semaphore()
+
+            params: Dict[str, Any] = {"scrapeOptions": {"formats": ["markdown", "html"]}}
+            if self.config.limit is not None:
+                params["limit"] = self.config.limit
 
             # Start the asynchronous crawl
-            crawl_obj = app.async_crawl_url(  # type: ignore
-                url_template,
-                params={
-                    "limit": self.config.limit,
-                    "scrapeOptions": {"formats": ["markdown", "html"]},
-                },
-            )
+            async with semaphore:
+                crawl_obj = await client.async_crawl_url(url_template, params)
 
             # Get the crawl ID from the response
             crawl_id = crawl_obj.get("id")
             if not crawl_id:
                 raise ValueError("No crawl ID received from async crawl request")
 
-            # Poll for completion with exponential backoff
-            max_attempts = 30  # Maximum number of attempts
-            base_delay = 2  # Base delay in seconds
+            # Poll for completion at a fixed interval until the deadline
+            loop = asyncio.get_running_loop()
+            start_time = loop.time()
+            deadline = start_time + MAX_WAIT_SECONDS
 
-            for attempt in range(max_attempts):
+            while True:
                 # Check the crawl status
-                status_response = app.check_crawl_status(crawl_id)  # type: ignore
+                async with semaphore:
+                    status_response = await client.check_crawl_status(crawl_id)
 
                 if status_response.get("status") == "completed":
+                    logging.info(f"Crawl {crawl_id} completed in {loop.time() - start_time:.1f}s")
                     crawl_result = status_response.get("data", {})
                     return FirecrawlCrawlNodeOutput(crawl_result=json.dumps(crawl_result))
 
@@ -107,9 +264,9 @@ class FirecrawlCrawlNode(BaseNode):
                         f"Crawl failed: {status_response.get('error', 'Unknown error')}"
                     )
 
-                # Calculate delay with exponential backoff (2^attempt seconds)
-                delay = min(base_delay * (2**attempt), 60)  # Cap at 60 seconds
-                await asyncio.sleep(delay)
+                if loop.time() + POLL_INTERVAL_SECONDS > deadline:
+                    break
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
 
             raise TimeoutError("Crawl did not complete within the maximum allowed time")
 
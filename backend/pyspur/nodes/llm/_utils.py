@@ -7,6 +7,7 @@ import re
 from typing import Any, Callable, Dict, List, Optional
 
 import litellm
+import orjson
 from docx2python import docx2python
 from dotenv import load_dotenv
 from litellm import acompletion
@@ -65,6 +66,16 @@ class ModelInfo(BaseModel):
     )
 
 
+def create_few_shot_messages(
+    few_shot_examples: Optional[List[Dict[str, str]]] = None,
+) -> List[Dict[str, str]]:
+    messages: List[Dict[str, str]] = []
+    for example in few_shot_examples or []:
+        messages.append({"role": "user", "content": example["input"]})
+        messages.append({"role": "assistant", "content": example["output"]})
+    return messages
+
+
 def create_messages(
     system_message: str,
     user_message: str,
@@ -72,10 +83,7 @@ def create_messages(
     history: Optional[List[Dict[str, str]]] = None,
 ) -> List[Dict[str, str]]:
     messages = [{"role": "system", "content": system_message}]
-    if few_shot_examples:
-        for example in few_shot_examples:
-            messages.append({"role": "user", "content": example["input"]})
-            messages.append({"role": "assistant", "content": example["output"]})
+    messages.extend(create_few_shot_messages(few_shot_examples))
     if history:
         messages.extend(history)
     messages.append({"role": "user", "content": user_message})
@@ -404,6 +412,12 @@ async def generate_text(
 
     # Ensure response is valid JSON for models that support it
     if supports_json:
+        # Fast check with orjson first; the stdlib parser below also accepts NaN/Infinity
+        try:
+            orjson.loads(response)
+            return response
+        except orjson.JSONDecodeError:
+            pass
         try:
             json.loads(response)
             return response
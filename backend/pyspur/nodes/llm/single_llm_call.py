@@ -1,84 +1,191 @@
 import json
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
+import orjson
 from dotenv import load_dotenv
-from jinja2 import Template
 from pydantic import BaseModel, Field
 
-from ...utils.pydantic_utils import get_nested_field, json_schema_to_model
+from ...utils.pydantic_utils import (
+    get_nested_field,
+    json_schema_to_model,
+    model_to_template_dict,
+)
 from ..base import (
     BaseNode,
     BaseNodeConfig,
     BaseNodeInput,
     BaseNodeOutput,
 )
-from ._utils import LLMModels, ModelInfo, create_messages, generate_text
+from ..utils.template_utils import get_template
+from ._utils import LLMModels, ModelInfo, create_few_shot_messages, generate_text
 
 load_dotenv()
 
-def repair_json(broken_json_str: str) -> str:
-    import re
-    from re import Match
-    from typing import Dict
-
-    # Handle empty or non-string input
-    if not broken_json_str or not broken_json_str.strip():
-        return "{}"
-
-    repaired = broken_json_str
+# Control characters that are invalid inside JSON strings, with their escapes
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+# Characters that end a value; another value may not follow them without a comma
+_VALUE_ENDS = ("}", "]", '"')
 
-    # Convert single quotes to double quotes, but not within already double-quoted strings
-    # First, temporarily replace valid double-quoted strings
-    placeholder = "PLACEHOLDER"
-    quoted_strings: Dict[str, str] = {}
-    counter = 0
 
-    def replace_quoted(match: Match[str]) -> str:
-        nonlocal counter
-        key = f"{placeholder}{counter}"
-        quoted_strings[key] = match.group(0)
-        counter += 1
-        return key
+def _scan_string(s: str, i: int, quote: str, out: List[str]) -> int:
+    """Copy the body of a string opened by `quote` at s[i - 1] into `out` as JSON.
 
-    # Temporarily store valid double-quoted strings
-    repaired = re.sub(r'"[^"\\]*(?:\\.[^"\\]*)*"', replace_quoted, repaired)
-
-    # Now convert remaining single quotes to double quotes
-    repaired = repaired.replace("'", '"')
+    The body is written as a double-quoted JSON string. Returns the index just past
+    the closing quote.
+    """
+    n = len(s)
+    while i < n:
+        ch = s[i]
+        i += 1
+        if ch == "\\" and i < n:
+            # \' is not a valid JSON escape; the apostrophe needs none
+            out.append(s[i] if s[i] == "'" else ch + s[i])
+            i += 1
+        elif ch == quote:
+            break
+        elif ch == '"':
+            # Double quote inside a single-quoted string
+            out.append('\\"')
+        else:
+            out.append(_STRING_ESCAPES.get(ch, ch))
+    out.append('"')
+    return i
+
+
+def _scan_word(s: str, i: int, out: List[str]) -> int:
+    """Copy the bare word starting at s[i] into `out`.
+
+    The word is quoted if it is used as an object key (followed by ':'). Returns the
+    index just past the word.
+    """
+    n = len(s)
+    j = i
+    while j < n and (s[j].isalnum() or s[j] == "_"):
+        j += 1
+    k = j
+    while k < n and s[k].isspace():
+        k += 1
+    word = s[i:j]
+    out.append(f'"{word}"' if k < n and s[k] == ":" else word)
+    return j
+
+
+def _repair_scan(s: str) -> str:
+    """Single pass over a JSON-like string that fixes common LLM formatting mistakes.
+
+    Outside of strings it converts single-quoted strings to double-quoted ones,
+    quotes bare object keys, drops trailing commas before closing brackets and
+    inserts missing commas between adjacent values. Inside strings it escapes
+    raw newlines and tabs. Characters are emitted as they are scanned, so the
+    cost is linear in the input size.
+    """
+    out: List[str] = []
+    n = len(s)
+    i = 0
+    prev = ""  # last non-whitespace character emitted outside of strings
+
+    while i < n:
+        ch = s[i]
+        if ch == '"' or ch == "'":
+            if prev in _VALUE_ENDS:
+                out.append(",")
+            out.append('"')
+            i = _scan_string(s, i + 1, ch, out)
+            prev = '"'
+            continue
+        if (ch.isalnum() or ch == "_") and (prev == "{" or prev == ","):
+            # Possibly a bare object key
+            i = _scan_word(s, i, out)
+            prev = out[-1][-1]
+            continue
+
+        if ch == "}" or ch == "]":
+            # Remove a trailing comma (and whitespace after it) before the closing bracket
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+        elif (ch == "{" or ch == "[") and prev in _VALUE_ENDS:
+            out.append(",")
+        out.append(ch)
+        if not ch.isspace():
+            prev = ch
+        i += 1
+
+    return "".join(out)
 
-    # Restore original double-quoted strings
-    for key, value in quoted_strings.items():
-        repaired = repaired.replace(key, value)
 
-    # Remove trailing commas before closing brackets/braces
-    repaired = re.sub(r",\s*([}\]])", r'\1', repaired)
+def repair_json(broken_json_str: str) -> str:
+    # Handle empty or non-string input
+    if not broken_json_str or not broken_json_str.strip():
+        return "{}"
 
-    # Add missing commas between elements
-    repaired = re.sub(r"([}\"])\s*([{\[])", r'\1,\2', repaired)
+    repaired = broken_json_str.strip()
 
-    # Fix unquoted string values
-    repaired = re.sub(r'([{,]\s*)(\w+)(\s*:)', r'\1"\2"\3', repaired)
+    # Unwrap a markdown code fence (```json ... ```); often that is all that is wrong
+    if repaired.startswith("```"):
+        fence_end = repaired.rfind("```")
+        first_newline = repaired.find("\n")
+        if first_newline != -1 and fence_end > first_newline:
+            repaired = repaired[first_newline + 1 : fence_end].strip()
+        try:
+            if isinstance(json.loads(repaired), dict):
+                return repaired
+        except ValueError:
+            pass
+
+    # Extract the substring from the first { to the last }, dropping any
+    # surrounding prose or quotes before the scan
+    start = repaired.find("{")
+    end = repaired.rfind("}")
+    if start == -1 or end < start:
+        # If no valid JSON object found, return empty object
+        return "{}"
 
-    # Remove any extra whitespace around colons
-    repaired = re.sub(r'\s*:\s*', ':', repaired)
+    return _repair_scan(repaired[start : end + 1])
 
-    # If the string is wrapped in extra quotes, remove them
-    if repaired.startswith('"') and repaired.endswith('"'):
-        repaired = repaired[1:-1]
 
-    # Extract the substring from the first { to the last }
-    start = repaired.find('{')
-    end = repaired.rfind('}')
-    if start != -1 and end != -1:
-        repaired = repaired[start:end+1]
-    else:
-        # If no valid JSON object found, return empty object
-        return "{}"
+def _parse_assistant_message(assistant_message_str: str) -> Dict[str, Any]:
+    """Parse the JSON object in an LLM response, repairing it if needed."""
+    # Only attempt a direct parse on payloads shaped like a JSON object; anything
+    # else (code fences, prose around the JSON) goes straight to repair_json.
+    # The stdlib parser is used because orjson turns integers wider than 64 bits into floats
+    stripped_message_str = assistant_message_str.strip()
+    if stripped_message_str.startswith("{") and stripped_message_str.endswith("}"):
+        try:
+            return json.loads(stripped_message_str)
+        except json.JSONDecodeError:
+            pass
+
+    try:
+        repaired_str = repair_json(assistant_message_str)
+        return json.loads(repaired_str)
+    except Exception as inner_e:
+        error_str = str(inner_e)
+        error_message = "An error occurred while parsing and repairing the assistant message"
+        error_type = "json_parse_error"
+        raise Exception(
+            json.dumps({
+                "type": "parsing_error",
+                "error_type": error_type,
+                "message": error_message,
+                "original_error": error_str,
+                "assistant_message_str": assistant_message_str,
+            })
+        )
 
-    # Final cleanup of whitespace
-    repaired = re.sub(r'\s+', ' ', repaired)
 
-    return repaired
+def _dump_input_dict(input_dict: Dict[str, Any]) -> str:
+    """Dump a node's input as indented JSON for use as the user message."""
+    try:
+        return orjson.dumps(
+            input_dict,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+        ).decode()
+    except orjson.JSONEncodeError:
+        # orjson rejects integers wider than 64 bits
+        return json.dumps(input_dict, indent=2, default=str)
 
 
 class SingleLLMCallNodeConfig(BaseNodeConfig):
@@ -134,32 +241,41 @@ class SingleLLMCallNode(BaseNode):
                 self.name,
                 SingleLLMCallNodeOutput,
             )  # type: ignore
+        self._model_name = LLMModels(self.config.llm_info.model).value
+        self._few_shot_prefix: Optional[List[Dict[str, str]]] = None
+
+    def _get_few_shot_prefix(self) -> List[Dict[str, str]]:
+        # Few-shot examples are static config, so their messages are built on the first run
+        # (not in setup, so malformed examples fail the run rather than node construction)
+        if self._few_shot_prefix is None:
+            self._few_shot_prefix = create_few_shot_messages(self.config.few_shot_examples)
+        return self._few_shot_prefix
 
     async def run(self, input: BaseModel) -> BaseModel:
         # Grab the entire dictionary from the input
-        raw_input_dict = input.model_dump()
+        raw_input_dict = model_to_template_dict(input)
 
         # Render system_message
-        system_message = Template(self.config.system_message).render(raw_input_dict)
+        system_message = get_template(self.config.system_message).render(raw_input_dict)
 
         try:
             # If user_message is empty, dump the entire raw dictionary
             if not self.config.user_message.strip():
-                user_message = json.dumps(raw_input_dict, indent=2)
+                user_message = _dump_input_dict(raw_input_dict)
             else:
-                user_message = Template(self.config.user_message).render(**raw_input_dict)
+                user_message = get_template(self.config.user_message).render(**raw_input_dict)
         except Exception as e:
             print(f"[ERROR] Failed to render user_message {self.name}")
             print(f"[ERROR] user_message: {self.config.user_message} with input: {raw_input_dict}")
             raise e
 
-        messages = create_messages(
-            system_message=system_message,
-            user_message=user_message,
-            few_shot_examples=self.config.few_shot_examples,
-        )
+        messages = [
+            {"role": "system", "content": system_message},
+            *self._get_few_shot_prefix(),
+            {"role": "user", "content": user_message},
+        ]
 
-        model_name = LLMModels(self.config.llm_info.model).value
+        model_name = self._model_name
 
         url_vars: Optional[Dict[str, str]] = None
         # Process URL variables if they exist and we're using a Gemini model
@@ -229,25 +345,7 @@ class SingleLLMCallNode(BaseNode):
                 )
             raise e
 
-        try:
-            assistant_message_dict = json.loads(assistant_message_str)
-        except Exception as e:
-            try:
-                repaired_str = repair_json(assistant_message_str)
-                assistant_message_dict = json.loads(repaired_str)
-            except Exception as inner_e:
-                error_str = str(inner_e)
-                error_message = "An error occurred while parsing and repairing the assistant message"
-                error_type = "json_parse_error"
-                raise Exception(
-                    json.dumps({
-                        "type": "parsing_error",
-                        "error_type": error_type,
-                        "message": error_message,
-                        "original_error": error_str,
-                        "assistant_message_str": assistant_message_str,
-                    })
-                )
+        assistant_message_dict = _parse_assistant_message(assistant_message_str)
 
         # Validate and return
         assistant_message = self.output_model.model_validate(assistant_message_dict)
@@ -1,9 +1,19 @@
 import logging
+from functools import lru_cache
 from typing import Any, Dict
 
 from jinja2 import Template
 
 
+@lru_cache(maxsize=512)
+def get_template(template_str: str) -> Template:
+    """Return the compiled Jinja template for a template string.
+
+    Compiled templates are cached by source, so they are shared across node instances.
+    """
+    return Template(template_str)
+
+
 def render_template_or_get_first_string(
     template_str: str, input_dict: Dict[Any, Any], node_name: str
 ) -> str:
@@ -24,7 +34,7 @@ def render_template_or_get_first_string(
     """
     try:
         # Render template
-        rendered = Template(template_str).render(**input_dict)
+        rendered = get_template(template_str).render(**input_dict)
 
         # If template is empty, find first string value
         if not template_str.strip():
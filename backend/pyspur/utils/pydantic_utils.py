@@ -1,6 +1,30 @@
-from typing import Any, Dict, List, Optional, Type
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Annotated, Any, Dict, List, Optional, Set, Tuple, Type
 
-from pydantic import BaseModel, Field, create_model
+import orjson
+from pydantic import AfterValidator, BaseModel, Field, create_model
+
+# Models created by json_schema_to_model, keyed by (schema hash, class name, base class).
+# Kept as a bounded LRU so edited schemas in a long-running server don't accumulate classes.
+_MODEL_CACHE_SIZE = 512
+_MODEL_CACHE: "OrderedDict[Tuple[bytes, str, Type[BaseModel]], Type[BaseModel]]" = OrderedDict()
+
+
+# JSON schema types that map directly onto a Python type
+_PRIMITIVE_TYPES: Dict[str, Any] = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "null": Optional[Any],  # Use Optional[Any] for nullable fields
+}
+
+
+def _schema_key(json_schema: Dict[str, Any]) -> bytes:
+    """Return a canonical hash of a JSON schema, independent of key order."""
+    return hashlib.blake2b(orjson.dumps(json_schema, option=orjson.OPT_SORT_KEYS)).digest()
 
 
 def get_nested_field(field_name_with_dots: str, model: BaseModel) -> Any:
@@ -17,6 +41,34 @@ def get_nested_field(field_name_with_dots: str, model: BaseModel) -> Any:
     return value
 
 
+def _flat_fields(model: BaseModel) -> Optional[Dict[str, Any]]:
+    """Return a model's fields and extras if they are all scalars, else None."""
+    values = {**model.__dict__, **(model.__pydantic_extra__ or {})}
+    for value in values.values():
+        if value is not None and not isinstance(value, (str, int, float, bool)):
+            return None
+    return values
+
+
+def model_to_template_dict(model: BaseModel) -> Dict[str, Any]:
+    """Get a model's fields (including extra fields) as a dictionary for template rendering.
+
+    Flat models, and models whose fields are flat models (such as node inputs keyed by
+    predecessor node), are read straight from the instances, skipping pydantic
+    serialization. Anything deeper falls back to model_dump() so that templates and
+    JSON serialization see plain dicts and lists.
+    """
+    values = {**model.__dict__, **(model.__pydantic_extra__ or {})}
+    for key, value in values.items():
+        if value is None or isinstance(value, (str, int, float, bool)):
+            continue
+        nested = _flat_fields(value) if isinstance(value, BaseModel) else None
+        if nested is None:
+            return model.model_dump()
+        values[key] = nested
+    return values
+
+
 def get_jinja_template_for_model(model: BaseModel) -> str:
     """
     Generate a Jinja template for a Pydantic model.
@@ -35,6 +87,7 @@ def json_schema_to_model(
 ) -> Type[BaseModel]:
     """
     Converts a JSON schema to a Pydantic BaseModel class.
+    Identical schemas reuse the previously created class.
 
     Args:
         json_schema: The JSON schema to convert.
@@ -42,6 +95,11 @@ def json_schema_to_model(
     Returns:
         A Pydantic BaseModel class.
     """
+    cache_key = (_schema_key(json_schema), model_class_name, base_class)
+    cached_model = _MODEL_CACHE.get(cache_key)
+    if cached_model is not None:
+        _MODEL_CACHE.move_to_end(cache_key)
+        return cached_model
 
     # Extract the model name from the schema title.
     model_name = model_class_name
@@ -53,7 +111,11 @@ def json_schema_to_model(
     }
 
     # Create the BaseModel class using create_model().
-    return create_model(model_name, **field_definitions, __base__=base_class)
+    model = create_model(model_name, **field_definitions, __base__=base_class)
+    _MODEL_CACHE[cache_key] = model
+    if len(_MODEL_CACHE) > _MODEL_CACHE_SIZE:
+        _MODEL_CACHE.popitem(last=False)
+    return model
 
 
 def json_schema_to_pydantic_field(
@@ -104,33 +166,61 @@ def json_schema_to_pydantic_type(json_schema: Dict[str, Any]) -> Any:
 
     type_ = json_schema.get("type")
 
-    if type_ == "string":
-        return str
-    elif type_ == "integer":
-        return int
-    elif type_ == "number":
-        return float
-    elif type_ == "boolean":
-        return bool
-    elif type_ == "array":
+    primitive_type = _PRIMITIVE_TYPES.get(type_) if isinstance(type_, str) else None
+    if primitive_type is not None:
+        return primitive_type
+
+    if type_ == "array":
         items_schema = json_schema.get("items")
-        if items_schema:
-            item_type = json_schema_to_pydantic_type(items_schema)
-            return List[item_type]
-        else:
-            return List
-    elif type_ == "object":
+        item_type = json_schema_to_pydantic_type(items_schema) if items_schema else Any
+        if json_schema.get("uniqueItems"):
+            # Kept as a list (not a set) so outputs stay JSON serializable
+            return Annotated[List[item_type], AfterValidator(_check_unique_items)]
+        return List[item_type] if items_schema else List
+
+    if type_ == "object":
         # Handle nested models.
         properties = json_schema.get("properties")
         if properties:
+            # Goes through the model cache, so repeated sub-schemas share one class
             nested_model = json_schema_to_model(json_schema)
             return nested_model
         else:
             return Dict
-    elif type_ == "null":
-        return Optional[Any]  # Use Optional[Any] for nullable fields
-    else:
-        raise ValueError(f"Unsupported JSON schema type: {type_}")
+
+    raise ValueError(f"Unsupported JSON schema type: {type_}")
+
+
+def _check_unique_items(items: List[Any]) -> List[Any]:
+    """Validate JSON schema `uniqueItems` arrays.
+
+    Items are compared structurally by their canonical keys, so numbers compare by
+    value (`1` equals `1.0`) while `1` and `true` stay distinct, as JSON Schema requires.
+    """
+    seen: Set[Any] = set()
+    for item in items:
+        key = _unique_key(item)
+        if key in seen:
+            raise ValueError("Array items must be unique")
+        seen.add(key)
+    return items
+
+
+def _unique_key(value: Any) -> Any:
+    """Build a hashable key for a JSON value that follows JSON Schema equality."""
+    if isinstance(value, BaseModel):
+        value = value.model_dump(mode="json")
+    if value is None or isinstance(value, (bool, str)):
+        return (type(value).__name__, value)
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return ("number", value)
+    if isinstance(value, dict):
+        return ("object", frozenset((k, _unique_key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return ("array", tuple(_unique_key(v) for v in value))
+    return ("other", json.dumps(value, sort_keys=True, default=str))
 
 
 def json_schema_to_simple_schema(json_schema: Dict[str, Any]) -> Dict[str, str]:
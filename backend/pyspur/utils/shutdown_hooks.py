@@ -0,0 +1,26 @@
+import logging
+from typing import Awaitable, Callable, List
+
+ShutdownHook = Callable[[], Awaitable[None]]
+
+# Async cleanup callbacks registered by modules that hold process-wide resources
+_SHUTDOWN_HOOKS: List[ShutdownHook] = []
+
+
+def register_shutdown_hook(hook: ShutdownHook) -> ShutdownHook:
+    """Register an async callback to run on application shutdown.
+
+    Returns the callback unchanged, so this can be used as a decorator.
+    """
+    if hook not in _SHUTDOWN_HOOKS:
+        _SHUTDOWN_HOOKS.append(hook)
+    return hook
+
+
+async def run_shutdown_hooks() -> None:
+    """Run the registered shutdown hooks, logging and skipping any that fail."""
+    for hook in _SHUTDOWN_HOOKS:
+        try:
+            await hook()
+        except Exception:
+            logging.exception(f"Shutdown hook {hook.__qualname__} failed")